@@ -2,7 +2,9 @@
 """
 __version__ = "0.3.2.dev0"
 
-from holodeck.holodeck import make
+import importlib
+import sys
+
 from holodeck.packagemanager import *
 
 __all__ = [
@@ -14,3 +16,34 @@ __all__ = [
     "packagemanager",
     "sensors",
 ]
+
+# Modules that pull in numpy and the environment, loaded on first access
+_lazy_modules = (
+    "agents",
+    "command",
+    "environments",
+    "holodeck",
+    "holodeckclient",
+    "joint_constraints",
+    "sensors",
+    "shmem",
+    "spaces",
+    "weather",
+)
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        # Tools that only use the package manager don't need to import the environment and numpy
+        if name == "make":
+            return importlib.import_module("holodeck.holodeck").make
+        if name in _lazy_modules:
+            return importlib.import_module("holodeck." + name)
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    def __dir__():
+        # Keep make and the lazy submodules visible to dir() and tab completion
+        return sorted(set(list(globals()) + ["make"] + list(_lazy_modules)))
+
+else:
+    from holodeck.holodeck import make
@@ -1,11 +1,14 @@
 """Definitions for different agents that can be controlled from Holodeck"""
 import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 
 import numpy as np
 from holodeck.spaces import ContinuousActionSpace, DiscreteActionSpace
 from holodeck.sensors import SensorDefinition, SensorFactory, RGBCamera
 from holodeck.command import AddSensorCommand, RemoveSensorCommand
+from holodeck.exceptions import HolodeckException
 from . import joint_constraints
 
 
@@ -80,11 +83,26 @@ class HolodeckAgent:
         agent_state_dict (dict): A dictionary that maps sensor names to sensor observation data.
     """
 
+    # Sensor buffers at least this big (e.g. 512x512 and larger cameras) are copied in parallel
+    # when an agent has more than one of them. NumPy releases the GIL while it copies them
+    _parallel_copy_size = 1024 * 1024
+    _copy_workers = min(4, os.cpu_count() or 1)
+
     def __init__(self, client, name="DefaultAgent"):
         self.name = name
         self._client = client
         self.agent_state_dict = dict()
         self.sensors = dict()
+        # Flat (sensor name, buffer) pairs of agent_state_dict, the sensors copied in parallel and
+        # the buffer of the Task sensor, rebuilt when sensors change
+        self._state_items = ()
+        self._parallel_copy_names = frozenset()
+        self._task_data = None
+        # Thread pool for the parallel copies, made on first use by the process that uses it
+        self._copy_pool = None
+        self._copy_pool_pid = None
+        # Sensors detached by _detach_for_respawn(), kept so add_sensors can reuse them
+        self._detached_sensors = dict()
 
         self._num_control_schemes = len(self.control_schemes)
 
@@ -123,11 +141,21 @@ class HolodeckAgent:
 
         for key in list(self.agent_state_dict.keys()):
             del self.agent_state_dict[key]
+        self._update_state_items()
 
         for key in list(self.sensors.keys()):
             self.sensors[key].clean_up_resources()
             del self.sensors[key]
 
+        for key in list(self._detached_sensors.keys()):
+            self._detached_sensors[key].clean_up_resources()
+            del self._detached_sensors[key]
+
+        # A pool inherited through fork has no worker threads left to shut down
+        if self._copy_pool is not None and self._copy_pool_pid == os.getpid():
+            self._copy_pool.shutdown()
+        self._copy_pool = None
+
     def act(self, action):
         """Sets the command for the agent. Action depends on the agent type and current control
         scheme.
@@ -141,6 +169,19 @@ class HolodeckAgent:
         """Sets the action to zeros, effectively removing any previous actions."""
         np.copyto(self._action_buffer, np.zeros(self._action_buffer.shape))
 
+    def _detach_for_respawn(self):
+        # Only valid while HolodeckEnvironment.reset() respawns the agent. The agent is returned to
+        # the state of a newly built one, but its sensors are kept so that add_sensors can reattach
+        # them instead of building them again. Sensors kept from before that weren't reattached
+        # (e.g. ones added at runtime) are cleaned up
+        for sensor in self._detached_sensors.values():
+            sensor.clean_up_resources()
+        self._detached_sensors = self.sensors
+        self.sensors = dict()
+        self.agent_state_dict = dict()
+        self._update_state_items()
+        self.set_control_scheme(0)
+
     def set_control_scheme(self, index):
         """Sets the control scheme for the agent. See :class:`ControlSchemes`.
 
@@ -203,14 +244,35 @@ class HolodeckAgent:
 
         for sensor_def in sensor_defs:
             if sensor_def.agent_name == self.name:
-                sensor = SensorFactory.build_sensor(self._client, sensor_def)
+                sensor = self._detached_sensors.pop(sensor_def.sensor_name, None)
+                if (
+                    type(sensor) is not sensor_def.type
+                    or sensor.config != sensor_def.config
+                ):
+                    if sensor is not None:
+                        sensor.clean_up_resources()
+                    sensor = SensorFactory.build_sensor(self._client, sensor_def)
+                # Observations are viewed and copied as arrays every tick, so anything else is
+                # rejected here rather than failing in the middle of training
+                if not isinstance(sensor.sensor_data, np.ndarray):
+                    raise HolodeckException(
+                        "Sensor {} doesn't provide its data as a numpy array".format(
+                            sensor_def.sensor_name
+                        )
+                    )
                 self.sensors[sensor_def.sensor_name] = sensor
-                self.agent_state_dict[sensor_def.sensor_name] = sensor.sensor_data
+                # Observations are only written by the engine, so they are handed out as read-only
+                # views of the shared memory
+                observation = sensor.sensor_data.view()
+                observation.flags.writeable = False
+                self.agent_state_dict[sensor_def.sensor_name] = observation
 
                 if not sensor_def.existing:
                     command_to_send = AddSensorCommand(sensor_def)
                     self._client.command_center.enqueue_command(command_to_send)
 
+        self._update_state_items()
+
     def remove_sensors(self, sensor_defs):
         """Removes a sensor from a particular agent object and detaches it from the agent in the
         world.
@@ -229,6 +291,52 @@ class HolodeckAgent:
             command_to_send = RemoveSensorCommand(self.name, sensor_def.sensor_name)
             self._client.command_center.enqueue_command(command_to_send)
 
+        self._update_state_items()
+
+    def _update_state_items(self):
+        self._state_items = tuple(self.agent_state_dict.items())
+        large_names = frozenset(
+            sensor_name
+            for sensor_name, data in self._state_items
+            if data.nbytes >= HolodeckAgent._parallel_copy_size
+        )
+        if len(large_names) > 1 and HolodeckAgent._copy_workers > 1:
+            self._parallel_copy_names = large_names
+        else:
+            self._parallel_copy_names = frozenset()
+        self._task_data = None
+        for sensor_name, data in self._state_items:
+            if "Task" in sensor_name:
+                self._task_data = data
+
+    def copy_state_dict(self):
+        """Copies the current sensor data of the agent out of shared memory.
+
+        Returns:
+            :obj:`dict`: A dictionary that maps sensor names to copies of their observation data.
+        """
+        # ndarray.copy skips the Python level wrapper and dispatch of np.copy. Copying into a fresh
+        # array is also no slower than np.copyto into a preallocated one, and keeps every returned
+        # state independent from the next tick
+        if not self._parallel_copy_names:
+            return {name: data.copy() for name, data in self._state_items}
+
+        # A forked child gets a copy of the pool, but none of its threads, so it makes its own
+        if self._copy_pool is None or self._copy_pool_pid != os.getpid():
+            self._copy_pool = ThreadPoolExecutor(
+                max_workers=HolodeckAgent._copy_workers
+            )
+            self._copy_pool_pid = os.getpid()
+        copies = {
+            name: self._copy_pool.submit(data.copy)
+            for name, data in self._state_items
+            if name in self._parallel_copy_names
+        }
+        return {
+            name: copies[name].result() if name in copies else data.copy()
+            for name, data in self._state_items
+        }
+
     def has_camera(self):
         """Indicates whether this agent has a camera or not.
 
@@ -241,6 +349,16 @@ class HolodeckAgent:
 
         return False
 
+    @property
+    def task_data(self):
+        """Gets the observation of the agent's task sensor, if it has one.
+
+        Returns:
+            :obj:`np.ndarray` or :obj:`None`: Read-only ``[reward, terminal]`` view of the task
+                sensor, or ``None`` if the agent has no task sensor.
+        """
+        return self._task_data
+
     @property
     def action_space(self):
         """Gets the action space for the current agent and control scheme.
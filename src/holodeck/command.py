@@ -62,6 +62,8 @@ class Command:
 
     """
 
+    __slots__ = ("_parameters", "_command_type")
+
     def __init__(self):
         self._parameters = []
         self._command_type = ""
@@ -132,7 +134,7 @@ class CommandCenter:
         self._client = client
 
         # Set up command buffer
-        self._command_bool_ptr = self._client.malloc("command_bool", [1], np.bool)
+        self._command_bool_ptr = self._client.malloc("command_bool", [1], np.uint8)
         # This is the size of the command buffer that Holodeck expects/will read.
         self.max_buffer = 1048576
         self._command_buffer_ptr = self._client.malloc(
@@ -182,15 +184,17 @@ class CommandCenter:
             to_write (:class:`str`): The string to write to the command buffer.
 
         """
-        np.copyto(self._command_bool_ptr, True)
+        self._command_bool_ptr[0] = 1
         to_write += (
             "0"  # The gason JSON parser in holodeck expects a 0 at the end of the file.
         )
         input_bytes = str.encode(to_write)
         if len(input_bytes) > self.max_buffer:
             raise HolodeckException("Error: Command length exceeds buffer size")
-        for index, val in enumerate(input_bytes):
-            self._command_buffer_ptr[index] = val
+        # Copy the whole message into shared memory at once
+        self._command_buffer_ptr[: len(input_bytes)] = np.frombuffer(
+            input_bytes, dtype=np.byte
+        )
 
     @property
     def queue_size(self):
@@ -211,6 +215,8 @@ class SpawnAgentCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         location,
@@ -294,6 +300,8 @@ class DebugDrawCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, draw_type, start, end, color, thickness):
         super(DebugDrawCommand, self).__init__()
         self._command_type = "DebugDraw"
@@ -316,6 +324,8 @@ class TeleportCameraCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, location, rotation):
         Command.__init__(self)
         self._command_type = "TeleportCamera"
@@ -330,6 +340,8 @@ class AddSensorCommand(Command):
         sensor_definition (~holodeck.sensors.SensorDefinition): Sensor to add
     """
 
+    __slots__ = ()
+
     def __init__(self, sensor_definition):
         Command.__init__(self)
         self._command_type = "AddSensor"
@@ -357,6 +369,8 @@ class RemoveSensorCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, agent, sensor):
         Command.__init__(self)
         self._command_type = "RemoveSensor"
@@ -374,6 +388,8 @@ class RotateSensorCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, agent, sensor, rotation):
         Command.__init__(self)
         self._command_type = "RotateSensor"
@@ -391,6 +407,8 @@ class RenderViewportCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, render_viewport):
         Command.__init__(self)
         self.set_command_type("RenderViewport")
@@ -407,6 +425,8 @@ class RGBCameraRateCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, agent_name, sensor_name, ticks_per_capture):
         Command.__init__(self)
         self._command_type = "RGBCameraRate"
@@ -423,6 +443,8 @@ class RenderQualityCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, render_quality):
         Command.__init__(self)
         self.set_command_type("AdjustRenderQuality")
@@ -439,6 +461,8 @@ class CustomCommand(Command):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, name, num_params=None, string_params=None):
         if num_params is None:
             num_params = []
@@ -7,7 +7,6 @@ with the agents.
 """
 import atexit
 import os
-import random
 import signal
 import subprocess
 import sys
@@ -29,6 +28,23 @@ from holodeck.agents import AgentDefinition, SensorDefinition, AgentFactory
 from holodeck.util import check_process_alive, log_paths
 from holodeck.weather import WeatherController
 
+# Prop types and materials accepted by HolodeckEnvironment.spawn_prop
+_PROP_TYPES = ("box", "sphere", "cylinder", "cone")
+_PROP_MATERIALS = (
+    "white",
+    "gold",
+    "cobblestone",
+    "brick",
+    "wood",
+    "grass",
+    "steel",
+    "black",
+)
+_AVAILABLE_PROPS = frozenset(_PROP_TYPES)
+_AVAILABLE_MATERIALS = frozenset(_PROP_MATERIALS)
+_PROP_TYPES_MESSAGE = "Available prop types: " + ", ".join(_PROP_TYPES)
+_PROP_MATERIALS_MESSAGE = "Available material types: " + ", ".join(_PROP_MATERIALS)
+
 
 class HolodeckEnvironment:
     """Proxy for communicating with a Holodeck world
@@ -69,6 +85,8 @@ class HolodeckEnvironment:
 
         copy_state (:obj:`bool`, optional):
             If the state should be copied or returned as a reference. Defaults to True.
+            References are read-only views of the shared memory, which the engine overwrites on
+            every tick. Use ``np.array(x)`` to keep a modifiable snapshot of one.
 
         scenario (:obj:`dict`):
             The scenario that is to be loaded. See :ref:`scenario-files` for the schema.
@@ -76,6 +94,10 @@ class HolodeckEnvironment:
         max_ticks (:obj: `int`, optional):
             The number of ticks to be run before returning to the terminal and cancels the tick function
 
+        seed (:obj:`int`, optional):
+            Seed for the random location and rotation of agents (see :ref:`scenario-files`), to
+            make it reproducible. Defaults to None, which seeds it from the operating system.
+
     """
 
     def __init__(
@@ -93,6 +115,7 @@ class HolodeckEnvironment:
         copy_state=True,
         scenario=None,
         max_ticks=sys.maxsize,
+        seed=None,
     ):
 
         if agent_definitions is None:
@@ -113,51 +136,62 @@ class HolodeckEnvironment:
         self._uuid = uuid
         self._pre_start_steps = pre_start_steps
         self._copy_state = copy_state
+        # copy_state is fixed for the lifetime of the environment, so the state functions are
+        # chosen once instead of checking it on every tick
+        if copy_state:
+            self._get_single_state = self._get_single_state_copy
+            self._get_full_state = self._get_full_state_copy
+        else:
+            self._get_single_state = self._get_single_state_view
+            self._get_full_state = self._get_full_state_view
         self._ticks_per_sec = ticks_per_sec
         self._scenario = scenario
         self._initial_agent_defs = agent_definitions
         self._spawned_agent_defs = []
         self._total_ticks = 0
         self._max_ticks = max_ticks
+        # Ticks only have to be counted when there is a tick limit to enforce
+        self._check_max_tick = (
+            self.check_max_tick if max_ticks != sys.maxsize else lambda: None
+        )
+        # Set while the engine is being ticked, exit signals received then are deferred
+        self._ticking = False
+        self._exit_requested = False
+        # Each environment has its own generator for scenario randomization, seeded with seed (or
+        # from the OS), so environments in the same process don't share the global state
+        self._rng = np.random.default_rng(seed)
 
         # Start world based on OS
         if start_world:
-            world_key = self._scenario["world"]
-            if os.name == "posix":
-                self.__linux_start_process__(
-                    binary_path,
-                    world_key,
-                    gl_version,
-                    verbose=verbose,
-                    show_viewport=show_viewport,
-                )
-            elif os.name == "nt":
-                self.__windows_start_process__(binary_path, world_key, verbose=verbose)
-            else:
-                raise HolodeckException("Unknown platform: " + os.name)
+            self._start_process(
+                binary_path,
+                self._scenario["world"],
+                gl_version,
+                verbose=verbose,
+                show_viewport=show_viewport,
+            )
 
         # Initialize Client
         self._client = HolodeckClient(self._uuid, start_world)
         self._command_center = CommandCenter(self._client)
         self._client.command_center = self._command_center
-        self._reset_ptr = self._client.malloc("RESET", [1], np.bool)
-        self._reset_ptr[0] = False
+        # The engine reads this flag as a one byte C++ bool
+        self._reset_ptr = self._client.malloc("RESET", [1], np.uint8)
+        self._reset_ptr[0] = 0
 
         # Initialize environment controller
         self.weather = WeatherController(self.send_world_command)
 
         # Set up agents already in the world
         self.agents = dict()
+        self._previous_agents = dict()
         self._state_dict = dict()
+        # (agent name, copy function) pairs used to copy the full state
+        self._state_copiers = ()
+        # Agents in the order they were added, which dicts don't keep before Python 3.7
+        self._ordered_agents = ()
         self._agent = None
-
-        # Set the default state function
-        self.num_agents = len(self.agents)
-
-        if self.num_agents == 1:
-            self._default_state_fn = self._get_single_state
-        else:
-            self._default_state_fn = self._get_full_state
+        self._select_state_fn()
 
         self._acquire_catch_crash()
 
@@ -168,12 +202,8 @@ class HolodeckEnvironment:
         self._initial_reset = False
         self.reset()
 
-        # System event handlers for graceful exit. We may only need to handle
-        # SIGHUB, but I'm being a little paranoid
-        if os.name == "posix":
-            signal.signal(signal.SIGHUP, self.graceful_exit)
-        signal.signal(signal.SIGTERM, self.graceful_exit)
-        signal.signal(signal.SIGINT, self.graceful_exit)
+        # System event handlers for graceful exit
+        self._install_signal_handlers()
 
     def clean_up_resources(self):
         """Frees up references to mapped memory files."""
@@ -186,9 +216,33 @@ class HolodeckEnvironment:
 
     def graceful_exit(self, _signum, _frame):
         """Signal handler to gracefully exit the script"""
+        if self._ticking:
+            # Don't free the shared memory from under a tick in progress, the tick loop exits as
+            # soon as it has finished
+            self._exit_requested = True
+            return
         self.__on_exit__()
         sys.exit()
 
+    @property
+    def num_agents(self):
+        """The number of agents in the environment.
+
+        Returns:
+            :obj:`int`: The number of agents.
+        """
+        return len(self.agents)
+
+    @property
+    def agent_names(self):
+        """The names of the agents in the environment, in the order they were added. This is the
+        order :meth:`act_batch` expects actions in.
+
+        Returns:
+            :obj:`tuple` of :obj:`str`: The agent names.
+        """
+        return tuple(agent.name for agent in self._ordered_agents)
+
     @property
     def action_space(self):
         """Gives the action space for the main agent.
@@ -205,21 +259,16 @@ class HolodeckEnvironment:
         Returns:
             :obj:`str`: Information in a string format.
         """
-        result = list()
-        result.append("Agents:\n")
-        for agent_name in self.agents:
-            agent = self.agents[agent_name]
-            result.append("\tName: ")
-            result.append(agent.name)
-            result.append("\n\tType: ")
-            result.append(type(agent).__name__)
-            result.append("\n\t")
-            result.append("Sensors:\n")
-            for _, sensor in agent.sensors.items():
-                result.append("\t\t")
-                result.append(sensor.name)
-                result.append("\n")
-        return "".join(result)
+        return "Agents:\n" + "".join(
+            "\tName: {}\n\tType: {}\n\tSensors:\n{}".format(
+                agent.name,
+                type(agent).__name__,
+                "".join(
+                    "\t\t{}\n".format(sensor.name) for sensor in agent.sensors.values()
+                ),
+            )
+            for agent in self.agents.values()
+        )
 
     def _load_scenario(self):
         """Loads the scenario defined in self._scenario_key.
@@ -231,7 +280,23 @@ class HolodeckEnvironment:
         if self._scenario is None:
             return
 
-        for agent in self._scenario["agents"]:
+        agents = self._scenario["agents"]
+
+        # Draw the location and rotation offsets of every agent at once. Each row holds the
+        # randomization bounds [d_x, d_y, d_z, d_pitch, d_roll, d_yaw] of one agent
+        max_offsets = np.array(
+            [
+                list(agent.get("location_randomization", [0, 0, 0]))
+                + list(agent.get("rotation_randomization", [0, 0, 0]))
+                for agent in agents
+            ],
+            dtype=np.float64,
+        ).reshape((len(agents), 6))
+        # A negative bound describes the same range as a positive one
+        max_offsets = np.abs(max_offsets)
+        offsets = self._rng.uniform(-max_offsets, max_offsets).tolist()
+
+        for agent, offset in zip(agents, offsets):
             sensors = []
             for sensor in agent["sensors"]:
                 if "sensor_type" not in sensor:
@@ -271,8 +336,6 @@ class HolodeckEnvironment:
                 "agent_name": agent["agent_type"],
                 "max_height": sys.maxsize,
                 "existing": False,
-                "location_randomization": [0, 0, 0],
-                "rotation_randomization": [0, 0, 0],
             }
 
             agent_config.update(agent)
@@ -283,26 +346,14 @@ class HolodeckEnvironment:
 
             max_height = agent_config["max_height"]
 
-            agent_location = agent_config["location"]
-            agent_rotation = agent_config["rotation"]
-
-            # Randomize the agent start location
-            d_x = agent_config["location_randomization"][0]
-            d_y = agent_config["location_randomization"][1]
-            d_z = agent_config["location_randomization"][2]
-
-            agent_location[0] += random.uniform(-d_x, d_x)
-            agent_location[1] += random.uniform(-d_y, d_y)
-            agent_location[2] += random.uniform(-d_z, d_z)
-
-            # Randomize the agent rotation
-            d_pitch = agent_config["rotation_randomization"][0]
-            d_roll = agent_config["rotation_randomization"][1]
-            d_yaw = agent_config["rotation_randomization"][1]
+            # Copies, so the offsets don't pile up in the scenario from one reset to the next
+            agent_location = list(agent_config["location"])
+            agent_rotation = list(agent_config["rotation"])
 
-            agent_rotation[0] += random.uniform(-d_pitch, d_pitch)
-            agent_rotation[1] += random.uniform(-d_roll, d_roll)
-            agent_rotation[2] += random.uniform(-d_yaw, d_yaw)
+            # Randomize the agent start location and rotation
+            for i in range(3):
+                agent_location[i] += offset[i]
+                agent_rotation[i] += offset[i + 3]
 
             agent_def = AgentDefinition(
                 agent_config["agent_name"],
@@ -366,13 +417,13 @@ class HolodeckEnvironment:
         """
         # Reset level
         self._initial_reset = True
-        self._reset_ptr[0] = True
+        self._reset_ptr[0] = 1
         for agent in self.agents.values():
             agent.clear_action()
         self._total_ticks -= 4  # This is so these 3 ticks don't hit the max_ticks threshold so the program successfully resets
-        self.tick()  # Must tick once to send reset before sending spawning commands
-        self.tick()  # Bad fix to potential race condition. See issue BYU-PCCL/holodeck#224
-        self.tick()
+        # Must tick once to send reset before sending spawning commands. The two extra ticks are
+        # a bad fix to potential race condition. See issue BYU-PCCL/holodeck#224
+        self._tick_engine(3)
         self._total_ticks = (
             -1 - self._pre_start_steps
         )  # Not sure why -1, but makes sure to only count user ticks
@@ -385,24 +436,24 @@ class HolodeckEnvironment:
             )
         self._command_center.clear()
 
-        # Load agents
+        # Load agents. The world reset removed every agent, but the agent objects of the last
+        # episode are kept so add_agent can reuse them instead of building them again
         self._spawned_agent_defs = []
+        self._previous_agents = self.agents
         self.agents = dict()
         self._state_dict = dict()
+        self._state_copiers = ()
+        self._ordered_agents = ()
+        self._select_state_fn()
         for agent_def in self._initial_agent_defs:
             self.add_agent(agent_def, agent_def.is_main_agent)
 
         self._load_scenario()
+        for agent in self._previous_agents.values():
+            agent.clean_up_resources()
+        self._previous_agents = dict()
 
-        self.num_agents = len(self.agents)
-
-        if self.num_agents == 1:
-            self._default_state_fn = self._get_single_state
-        else:
-            self._default_state_fn = self._get_full_state
-
-        for _ in range(self._pre_start_steps + 1):
-            self.tick()
+        self._tick_engine(self._pre_start_steps + 1)
 
         return self._default_state_fn()
 
@@ -426,21 +477,13 @@ class HolodeckEnvironment:
         if not self._initial_reset:
             raise HolodeckException("You must call .reset() before .step()")
 
-        last_state = None
-
-        for _ in range(ticks):
-            if self._agent is not None:
-                self._agent.act(action)
-
-            self._command_center.handle_buffer()
-            self._client.release()
-            self._acquire_catch_crash()
+        if self._agent is not None:
+            self._agent.act(action)
 
-            reward, terminal = self._get_reward_terminal()
-            last_state = self._default_state_fn(), reward, terminal, None
-            self.check_max_tick()
+        self._tick_engine(ticks)
 
-        return last_state
+        reward, terminal = self._get_reward_terminal()
+        return self._default_state_fn(), reward, terminal, None
 
     def act(self, agent_name, action):
         """Supplies an action to a particular agent, but doesn't tick the environment.
@@ -455,6 +498,25 @@ class HolodeckEnvironment:
         """
         self.agents[agent_name].act(action)
 
+    def act_batch(self, actions):
+        """Supplies an action to every agent at once, but doesn't tick the environment.
+           Same as calling :meth:`act` for each agent, in the order of :attr:`agent_names`.
+
+        Args:
+            actions (:obj:`np.ndarray` or :obj:`list`): One action per agent, in the order of
+                :attr:`agent_names`, e.g. a ``(num_agents, action_dim)`` array when all agents
+                share an action space.
+        """
+        if len(actions) != len(self._ordered_agents):
+            raise HolodeckException(
+                "Expected {} actions, got {}".format(
+                    len(self._ordered_agents), len(actions)
+                )
+            )
+
+        for agent, action in zip(self._ordered_agents, actions):
+            agent.act(action)
+
     def get_joint_constraints(self, agent_name, joint_name):
         """Returns the corresponding swing1, swing2 and twist limit values for the
                 specified agent and joint. Will return None if the joint does not
@@ -475,22 +537,45 @@ class HolodeckEnvironment:
                 sensors information for each sensor. The sensors always include the reward and
                 terminal sensors.
 
+                If the environment has a single agent, its state is returned directly instead, like
+                in :meth:`step`. This follows :attr:`num_agents`, so the full state is returned as
+                soon as another agent is added with :meth:`add_agent`.
+
                 Will return the state from the last tick executed.
         """
         if not self._initial_reset:
             raise HolodeckException("You must call .reset() before .tick()")
 
-        state = None
+        self._tick_engine(num_ticks)
+
+        return self._default_state_fn()
 
-        for _ in range(num_ticks):
-            self._command_center.handle_buffer()
+    def _tick_engine(self, num_ticks):
+        """Hands control to the engine for ``num_ticks`` ticks without building any state.
 
-            self._client.release()
-            self._acquire_catch_crash()
-            state = self._default_state_fn()
-            self.check_max_tick()
+        The action buffers persist between ticks and only the state of the last tick is ever
+        returned, so the state is only read once the engine has run every tick.
+        """
+        # Bind the per-tick calls to locals once instead of looking them up on every tick
+        handle_buffer = self._command_center.handle_buffer
+        release = self._client.release
+        acquire = self._acquire_catch_crash
+        check_max_tick = self._check_max_tick
 
-        return state
+        self._ticking = True
+        try:
+            for _ in range(num_ticks):
+                if self._exit_requested:
+                    break
+                handle_buffer()
+                release()
+                acquire()
+                check_max_tick()
+        finally:
+            self._ticking = False
+            if self._exit_requested:
+                self.__on_exit__()
+                sys.exit()
 
     def check_max_tick(self):
         """Increments tick counter '_total_ticks' and throws a
@@ -528,7 +613,9 @@ class HolodeckEnvironment:
 
         It will be spawn when :meth:`tick` or :meth:`step` is called next.
 
-        The agent won't be able to be used until the next frame.
+        The agent won't be able to be used until the next frame. Adding a second agent switches
+        :meth:`tick` and :meth:`step` from returning the single agent state to the full state (see
+        :attr:`num_agents`).
 
         Args:
             agent_def (:class:`~holodeck.agents.AgentDefinition`): The definition of the agent to
@@ -537,8 +624,12 @@ class HolodeckEnvironment:
         if agent_def.name in self.agents:
             raise HolodeckException("Error. Duplicate agent name. ")
 
-        self.agents[agent_def.name] = AgentFactory.build_agent(self._client, agent_def)
-        self._state_dict[agent_def.name] = self.agents[agent_def.name].agent_state_dict
+        agent = self._previous_agents.pop(agent_def.name, None)
+        if type(agent) is agent_def.type:
+            agent._detach_for_respawn()
+        else:
+            agent = AgentFactory.build_agent(self._client, agent_def)
+        self.agents[agent_def.name] = agent
 
         if not agent_def.existing:
             command_to_send = SpawnAgentCommand(
@@ -551,7 +642,11 @@ class HolodeckEnvironment:
             )
 
             self._client.command_center.enqueue_command(command_to_send)
-        self.agents[agent_def.name].add_sensors(agent_def.sensors)
+        agent.add_sensors(agent_def.sensors)
+        self._state_dict[agent_def.name] = agent.agent_state_dict
+        self._state_copiers += ((agent_def.name, agent.copy_state_dict),)
+        self._ordered_agents += (agent,)
+        self._select_state_fn()
         if is_main_agent:
             self._agent = self.agents[agent_def.name]
 
@@ -609,28 +704,14 @@ class HolodeckEnvironment:
         prop_type = prop_type.lower()
         material = material.lower()
 
-        available_props = ["box", "sphere", "cylinder", "cone"]
-        available_materials = [
-            "white",
-            "gold",
-            "cobblestone",
-            "brick",
-            "wood",
-            "grass",
-            "steel",
-            "black",
-        ]
-
-        if prop_type not in available_props:
+        if prop_type not in _AVAILABLE_PROPS:
             raise HolodeckException(
-                "{} not an available prop. Available prop types: {}".format(
-                    prop_type, available_props
-                )
+                "{} not an available prop. {}".format(prop_type, _PROP_TYPES_MESSAGE)
             )
-        if material not in available_materials and material != "":
+        if material not in _AVAILABLE_MATERIALS and material != "":
             raise HolodeckException(
-                "{} not an available material. Available material types: {}".format(
-                    material, available_materials
+                "{} not an available material. {}".format(
+                    material, _PROP_MATERIALS_MESSAGE
                 )
             )
 
@@ -709,7 +790,7 @@ class HolodeckEnvironment:
     ):
         import posix_ipc
 
-        out_stream = sys.stdout if verbose else open(os.devnull, "w")
+        out_stream = sys.stdout if verbose else subprocess.DEVNULL
         loading_semaphore = posix_ipc.Semaphore(
             "/HOLODECK_LOADING_SEM" + self._uuid,
             os.O_CREAT | os.O_EXCL,
@@ -750,10 +831,13 @@ class HolodeckEnvironment:
         loading_semaphore.unlink()
         loading_semaphore.close()
 
-    def __windows_start_process__(self, binary_path, task_key, verbose):
+    def __windows_start_process__(
+        self, binary_path, task_key, gl_version, verbose, show_viewport=True
+    ):
+        # gl_version and show_viewport only apply to Linux
         import win32event
 
-        out_stream = sys.stdout if verbose else open(os.devnull, "w")
+        out_stream = sys.stdout if verbose else subprocess.DEVNULL
         loading_semaphore = win32event.CreateSemaphore(
             None, 0, 1, "Global\\HOLODECK_LOADING_SEM" + self._uuid
         )
@@ -780,6 +864,29 @@ class HolodeckEnvironment:
         if response == win32event.WAIT_TIMEOUT:
             raise HolodeckException("Timed out waiting for binary to load")
 
+    def __unsupported_start_process__(self, *_args, **_kwargs):
+        raise HolodeckException("Unknown platform: " + os.name)
+
+    def __install_signal_handlers__(self):
+        signal.signal(signal.SIGTERM, self.graceful_exit)
+        signal.signal(signal.SIGINT, self.graceful_exit)
+
+    def __posix_install_signal_handlers__(self):
+        # We may only need to handle SIGHUB, but I'm being a little paranoid
+        signal.signal(signal.SIGHUP, self.graceful_exit)
+        self.__install_signal_handlers__()
+
+    # Pick the platform specific implementations once, when the module is imported
+    if os.name == "posix":
+        _start_process = __linux_start_process__
+        _install_signal_handlers = __posix_install_signal_handlers__
+    elif os.name == "nt":
+        _start_process = __windows_start_process__
+        _install_signal_handlers = __install_signal_handlers__
+    else:
+        _start_process = __unsupported_start_process__
+        _install_signal_handlers = __install_signal_handlers__
+
     def __on_exit__(self):
         if hasattr(self, "_exited"):
             return
@@ -803,41 +910,34 @@ class HolodeckEnvironment:
         # TODO: Suppress exceptions?
         self.__on_exit__()
 
-    def _get_single_state(self):
+    def _select_state_fn(self):
+        # The tick path only calls the state function, so the choice between the single agent and
+        # the full state is made here, whenever the number of agents changes
+        self._default_state_fn = (
+            self._get_single_state if self.num_agents == 1 else self._get_full_state
+        )
 
+    def _get_single_state_copy(self):
         if self._agent is not None:
-            return (
-                self._create_copy(self._state_dict[self._agent.name])
-                if self._copy_state
-                else self._state_dict[self._agent.name]
-            )
+            return self._agent.copy_state_dict()
+        return self._get_full_state_copy()
 
-        return self._get_full_state()
+    def _get_single_state_view(self):
+        if self._agent is not None:
+            # The agent's state dict is the same object stored in self._state_dict
+            return self._agent.agent_state_dict
+        return self._state_dict
 
-    def _get_full_state(self):
-        return (
-            self._create_copy(self._state_dict)
-            if self._copy_state
-            else self._state_dict
-        )
+    def _get_full_state_copy(self):
+        return {name: copy() for name, copy in self._state_copiers}
+
+    def _get_full_state_view(self):
+        return self._state_dict
 
     def _get_reward_terminal(self):
-        reward = None
-        terminal = None
-        if self._agent is not None:
-            for sensor in self._state_dict[self._agent.name]:
-                if "Task" in sensor:
-                    reward = self._state_dict[self._agent.name][sensor][0]
-                    terminal = self._state_dict[self._agent.name][sensor][1] == 1
-        return reward, terminal
-
-    def _create_copy(self, obj):
-        if isinstance(obj, dict):  # Deep copy dictionary
-            copy = dict()
-            for k, v in obj.items():
-                if isinstance(v, dict):
-                    copy[k] = self._create_copy(v)
-                else:
-                    copy[k] = np.copy(v)
-            return copy
-        return None  # Not implemented for other types
+        # The agent keeps its Task sensor buffer up to date as sensors are added and removed, so
+        # this doesn't have to search the sensors on every tick
+        task_data = self._agent.task_data if self._agent is not None else None
+        if task_data is None:
+            return None, None
+        return task_data[0], task_data[1] == 1
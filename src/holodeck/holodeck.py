@@ -32,6 +32,7 @@ def make(
     show_viewport=True,
     ticks_per_sec=30,
     copy_state=True,
+    seed=None,
 ):
     """Creates a Holodeck environment
 
@@ -61,7 +62,13 @@ def make(
             The number of frame ticks per unreal seconds. Defaults to 30.
 
         copy_state (:obj:`bool`, optional):
-            If the state should be copied or passed as a reference when returned. Defaults to True
+            If the state should be copied or passed as a reference when returned. Defaults to True.
+            References are read-only views of the shared memory, which the engine overwrites on
+            every tick.
+
+        seed (:obj:`int`, optional):
+            Seed for the random location and rotation of agents, to make it reproducible.
+            Defaults to None, which seeds it from the operating system.
 
     Returns:
         :class:`~holodeck.environments.HolodeckEnvironment`: A holodeck environment instantiated
@@ -99,6 +106,7 @@ def make(
     param_dict["show_viewport"] = show_viewport
     param_dict["copy_state"] = copy_state
     param_dict["ticks_per_sec"] = ticks_per_sec
+    param_dict["seed"] = seed
 
     if window_res is not None:
         param_dict["window_size"] = window_res
@@ -15,6 +15,10 @@ class HolodeckClient:
         for the engine
     """
 
+    # Bounds on the number of non-blocking attempts to acquire the engine semaphore before blocking
+    _max_spin_count = 2048
+    _min_spin_count = 16
+
     def __init__(self, uuid="", should_timeout=False):
         self._uuid = uuid
 
@@ -26,6 +30,7 @@ class HolodeckClient:
         self.unlink = None
         self.command_center = None
         self.should_timeout = should_timeout
+        self._spin_count = HolodeckClient._max_spin_count
 
         self._memory = dict()
         self._sensors = dict()  # never used
@@ -67,7 +72,11 @@ class HolodeckClient:
             win32event.ReleaseSemaphore(sem, 1)
 
         def windows_unlink():
-            pass
+            self._semaphore1.Close()
+            self._semaphore2.Close()
+            for key in list(self._memory.keys()):
+                self._memory[key].unlink()
+                del self._memory[key]
 
         self._get_semaphore_fn = windows_acquire_semaphore
         self._release_semaphore_fn = windows_release_semaphore
@@ -88,6 +97,22 @@ class HolodeckClient:
         self.timeout = 10 if self.should_timeout else None
 
         def posix_acquire_semaphore(sem):
+            # The engine usually hands control back shortly after it was released, so first spin on
+            # non-blocking attempts (sem_trywait stays in user space) before sleeping in the kernel.
+            # The spin budget grows while spinning pays off and shrinks while it doesn't.
+            for _ in range(self._spin_count):
+                try:
+                    sem.acquire(0)
+                except posix_ipc.BusyError:
+                    continue
+                self._spin_count = min(
+                    self._spin_count * 2, HolodeckClient._max_spin_count
+                )
+                return
+            self._spin_count = max(
+                self._spin_count // 2, HolodeckClient._min_spin_count
+            )
+
             try:
                 sem.acquire(self.timeout)
             except posix_ipc.BusyError as error:
@@ -236,6 +236,8 @@ class ViewportCapture(HolodeckSensor):
     dimensions.
 
     The default resolution is ``1280x720``, matching the default Viewport resolution.
+
+    Like the :class:`RGBCamera`, the image is a ``uint8`` RGBA array.
     """
 
     sensor_type = "ViewportCapture"
@@ -276,6 +278,9 @@ class RGBCamera(HolodeckSensor):
     The default capture resolution is 256x256x256x4, corresponding to the RGBA channels.
     The resolution can be increased, but will significantly impact performance.
 
+    The image is a ``uint8`` array. If a model needs floats in ``[0, 1]``, convert it with
+    ``image.astype(np.float32) / 255.0``.
+
     **Configuration**
 
     The ``configuration`` block (see :ref:`configuration-block`) accepts the following
@@ -545,7 +550,7 @@ class CollisionSensor(HolodeckSensor):
 
     @property
     def dtype(self):
-        return np.bool
+        return np.bool_
 
     @property
     def data_shape(self):
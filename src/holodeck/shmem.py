@@ -1,8 +1,6 @@
 """Shared memory with memory mapping"""
-import ctypes
 import mmap
 import os
-from functools import reduce
 
 import numpy as np
 
@@ -16,45 +14,114 @@ class Shmem:
     Args:
         name (:obj:`str`): Name the points to the beginning of the shared memory block
         shape (:obj:`int`): Shape of the memory block
-        dtype (type, optional): data type of the shared memory. Defaults to np.float32
+        dtype (type, optional): data type of the shared memory, anything :obj:`numpy.dtype`
+            accepts. Defaults to np.float32
         uuid (:obj:`str`, optional): UUID of the memory block. Defaults to ""
+
+    A block can be handed to NumPy, or to anything that understands DLPack, without copying it,
+    e.g. ``np.asarray(shmem)`` or ``torch.from_dlpack(shmem)``. DLPack requires NumPy 1.22 or
+    newer.
     """
 
-    _numpy_to_ctype = {
-        np.float32: ctypes.c_float,
-        np.uint8: ctypes.c_uint8,
-        np.bool: ctypes.c_bool,
-        np.byte: ctypes.c_byte,
-    }
+    # Blocks at least this big (e.g. camera images) are backed by transparent huge pages if possible
+    _huge_page_size = 2 * 1024 * 1024
 
     def __init__(self, name, shape, dtype=np.float32, uuid=""):
         self.shape = shape
-        self.dtype = dtype
-        size = reduce(lambda x, y: x * y, shape)
-        size_bytes = np.dtype(dtype).itemsize * size
+        self.dtype = np.dtype(dtype)
+        size = int(np.prod(shape))
+        size_bytes = self.dtype.itemsize * size
 
         self._mem_path = None
         self._mem_pointer = None
+        self._cuda_registered = False
         if os.name == "nt":
             self._mem_path = "/HOLODECK_MEM" + uuid + "_" + name
             self._mem_pointer = mmap.mmap(0, size_bytes, self._mem_path)
         elif os.name == "posix":
+            # The engine opens every block by this name, so it has to be a named file on the
+            # /dev/shm tmpfs (not e.g. an anonymous memfd) that lives until unlink() is called
             self._mem_path = "/dev/shm/HOLODECK_MEM" + uuid + "_" + name
             f = os.open(self._mem_path, os.O_CREAT | os.O_TRUNC | os.O_RDWR)
+            # /dev/shm is a tmpfs, so there is no backing store to fsync; sizing the file is enough
             os.ftruncate(f, size_bytes)
-            os.fsync(f)
 
-            self._mem_pointer = mmap.mmap(f, size_bytes)
+            # mmap.madvise is only available on Python 3.8+
+            huge_pages = size_bytes >= Shmem._huge_page_size and hasattr(
+                mmap, "MADV_HUGEPAGE"
+            )
+
+            # Fault the pages in now, so the first tick doesn't pay for it. Blocks that ask for huge
+            # pages are faulted in after the advice, or they would already be backed by small pages
+            # (mmap.MAP_POPULATE is only available on Python 3.10+)
+            flags = mmap.MAP_SHARED
+            if not huge_pages:
+                flags |= getattr(mmap, "MAP_POPULATE", 0)
+            self._mem_pointer = mmap.mmap(f, size_bytes, flags=flags)
             os.close(
                 f
             )  # we don't need the file descriptor to stay open. see the man page
+
+            if huge_pages:
+                try:
+                    self._mem_pointer.madvise(mmap.MADV_HUGEPAGE)
+                except OSError:
+                    pass  # kernel without transparent huge page support
+                self._prefault()
         else:
             raise HolodeckException("Currently unsupported os: " + os.name)
 
-        self.np_array = np.ndarray(shape, dtype=dtype)
-        self.np_array.data = (Shmem._numpy_to_ctype[dtype] * size).from_buffer(
-            self._mem_pointer
+        self.np_array = np.frombuffer(
+            self._mem_pointer, dtype=self.dtype, count=size
+        ).reshape(shape)
+
+    def _prefault(self):
+        if hasattr(mmap, "MADV_POPULATE_WRITE"):
+            try:
+                self._mem_pointer.madvise(mmap.MADV_POPULATE_WRITE)
+                return
+            except OSError:
+                pass  # kernels older than 5.14
+        # Otherwise write to one byte of every page. The file was just created, so it's all zeros
+        np.frombuffer(self._mem_pointer, dtype=np.uint8)[:: mmap.PAGESIZE] = 0
+
+    def __array__(self, dtype=None, copy=None):
+        # Hand out the array itself rather than a raw pointer, so arrays made from the block keep
+        # the mmap exported and unlink() can't unmap it from under them
+        if copy or (dtype is not None and np.dtype(dtype) != self.dtype):
+            return self.np_array.astype(self.dtype if dtype is None else dtype)
+        return self.np_array
+
+    # ndarray only supports DLPack on NumPy 1.22+
+    if hasattr(np.ndarray, "__dlpack__"):
+
+        def __dlpack__(self, *args, **kwargs):
+            return self.np_array.__dlpack__(*args, **kwargs)
+
+        def __dlpack_device__(self):
+            return self.np_array.__dlpack_device__()
+
+    def register_cuda_host(self, flags=0):
+        """Page-locks the block with ``cudaHostRegister``, so it can be copied to a GPU directly
+        (and asynchronously) instead of being staged through a pinned buffer by the CUDA driver.
+        The block is unregistered again when it is unlinked.
+
+        Requires `cuda-python <https://nvidia.github.io/cuda-python/>`_.
+
+        Args:
+            flags (:obj:`int`, optional): ``cudaHostRegister`` flags. Defaults to
+                ``cudaHostRegisterDefault``
+        """
+        if self._cuda_registered:
+            return
+
+        cudart = _import_cudart()
+        (err,) = cudart.cudaHostRegister(
+            self.np_array.ctypes.data, self.np_array.nbytes, flags
         )
+        if err != cudart.cudaError_t.cudaSuccess:
+            raise HolodeckException("cudaHostRegister failed: " + str(err))
+        self._cuda_registered = True
 
     def unlink(self):
         """unlinks the shared memory"""
@@ -66,8 +133,35 @@ class Shmem:
             raise HolodeckException("Currently unsupported os: " + os.name)
 
     def __linux_unlink__(self):
-        del self.np_array
         os.remove(self._mem_path)
+        self._close_mapping()
+
+    def _close_mapping(self):
+        if self._cuda_registered:
+            _import_cudart().cudaHostUnregister(self.np_array.ctypes.data)
+            self._cuda_registered = False
+
+        del self.np_array
+        try:
+            self._mem_pointer.close()
+        except BufferError:
+            # Arrays viewing the block are still alive (e.g. a state returned with
+            # copy_state=False). The mapping is released once they are garbage collected
+            pass
 
     def __windows_unlink__(self):
-        pass
+        # The named mapping is destroyed once every handle to it is closed
+        self._close_mapping()
+
+
+def _import_cudart():
+    try:
+        from cuda.bindings import runtime
+    except ImportError:
+        try:
+            from cuda import cudart as runtime
+        except ImportError:
+            raise HolodeckException(
+                "Registering shared memory with CUDA requires cuda-python"
+            )
+    return runtime
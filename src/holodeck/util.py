@@ -3,8 +3,6 @@ import math
 import os
 import holodeck
 
-from holodeck.command import DebugDrawCommand
-
 
 try:
     unicode  # Python 2
@@ -111,6 +109,8 @@ def draw_line(env, start, end, color=None, thickness=10.0):
         color (:obj:`list``): ``[r, g, b]`` color value
         thickness (:obj:`float`): thickness of the line
     """
+    from holodeck.command import DebugDrawCommand
+
     color = [255, 0, 0] if color is None else color
     command_to_send = DebugDrawCommand(0, start, end, color, thickness)
     env._enqueue_command(command_to_send)
@@ -127,6 +127,8 @@ def draw_arrow(env, start, end, color=None, thickness=10.0):
         color (:obj:`list`): ``[r, g, b]`` color value
         thickness (:obj:`float`): thickness of the arrow
     """
+    from holodeck.command import DebugDrawCommand
+
     color = [255, 0, 0] if color is None else color
     command_to_send = DebugDrawCommand(1, start, end, color, thickness)
     env._enqueue_command(command_to_send)
@@ -143,6 +145,8 @@ def draw_box(env, center, extent, color=None, thickness=10.0):
         color (:obj:`list`): ``[r, g, b]`` color value
         thickness (:obj:`float`): thickness of the lines
     """
+    from holodeck.command import DebugDrawCommand
+
     color = [255, 0, 0] if color is None else color
     command_to_send = DebugDrawCommand(2, center, extent, color, thickness)
     env._enqueue_command(command_to_send)
@@ -158,6 +162,8 @@ def draw_point(env, loc, color=None, thickness=10.0):
         color (:obj:`list` of :obj:`float`): ``[r, g, b]`` color value
         thickness (:obj:`float`): thickness of the point
     """
+    from holodeck.command import DebugDrawCommand
+
     color = [255, 0, 0] if color is None else color
     command_to_send = DebugDrawCommand(3, loc, [0, 0, 0], color, thickness)
     env._enqueue_command(command_to_send)
@@ -0,0 +1,62 @@
+import uuid
+import holodeck
+import numpy as np
+import pytest
+from holodeck.exceptions import HolodeckException
+from tests.utils.equality import almost_equal
+
+two_turtle_config = {
+    "name": "test_act_batch",
+    "world": "TestWorld",
+    "main_agent": "turtle0",
+    "agents": [
+        {
+            "agent_name": "turtle0",
+            "agent_type": "TurtleAgent",
+            "sensors": [{"sensor_type": "LocationSensor"}],
+            "control_scheme": 0,
+            "location": [0.95, -1.75, 0.5],
+        },
+        {
+            "agent_name": "turtle1",
+            "agent_type": "TurtleAgent",
+            "sensors": [{"sensor_type": "LocationSensor"}],
+            "control_scheme": 0,
+            "location": [0.95, 1.75, 0.5],
+        },
+    ],
+}
+
+
+def test_act_batch_moves_every_agent():
+    """Make sure that an action batch is applied to each agent, in the order of env.agent_names"""
+    binary_path = holodeck.packagemanager.get_binary_path_for_package("DefaultWorlds")
+
+    with holodeck.environments.HolodeckEnvironment(
+        scenario=two_turtle_config,
+        binary_path=binary_path,
+        show_viewport=False,
+        uuid=str(uuid.uuid4()),
+    ) as env:
+        state = env.reset()
+        # Only compare x and y, the turtles may still be settling onto the ground
+        start = {
+            name: np.copy(state[name]["LocationSensor"][:2]) for name in env.agents
+        }
+
+        assert env.agent_names == ("turtle0", "turtle1")
+
+        # Only turtle0 is told to drive forward
+        forward = {"turtle0": [160, 0], "turtle1": [0, 0]}
+        env.act_batch(np.array([forward[name] for name in env.agent_names]))
+        state = env.tick(30)
+
+        assert not almost_equal(
+            start["turtle0"], state["turtle0"]["LocationSensor"][:2]
+        ), "turtle0 did not move!"
+        assert almost_equal(
+            start["turtle1"], state["turtle1"]["LocationSensor"][:2]
+        ), "turtle1 moved without being told to!"
+
+        with pytest.raises(HolodeckException):
+            env.act_batch(np.zeros((1, 2)))
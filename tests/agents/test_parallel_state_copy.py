@@ -0,0 +1,121 @@
+import os
+import signal
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import holodeck
+import holodeck.agents
+import numpy as np
+import pytest
+from holodeck.agents import HolodeckAgent
+
+two_camera_config = {
+    "name": "test_parallel_state_copy",
+    "world": "TestWorld",
+    "main_agent": "sphere0",
+    "agents": [
+        {
+            "agent_name": "sphere0",
+            "agent_type": "SphereAgent",
+            "sensors": [
+                {
+                    "sensor_type": "RGBCamera",
+                    "sensor_name": "LeftCamera",
+                    "configuration": {"CaptureWidth": 1024, "CaptureHeight": 1024},
+                },
+                {
+                    "sensor_type": "RGBCamera",
+                    "sensor_name": "RightCamera",
+                    "configuration": {"CaptureWidth": 1024, "CaptureHeight": 1024},
+                },
+            ],
+            "control_scheme": 0,
+            "location": [0.95, -1.75, 0.5],
+        }
+    ],
+}
+
+
+@pytest.fixture
+def copy_pools(monkeypatch):
+    """Records every thread pool the agents make"""
+    pools = []
+
+    class RecordingThreadPoolExecutor(ThreadPoolExecutor):
+        def __init__(self, *args, **kwargs):
+            super(RecordingThreadPoolExecutor, self).__init__(*args, **kwargs)
+            pools.append(self)
+
+    monkeypatch.setattr(
+        holodeck.agents, "ThreadPoolExecutor", RecordingThreadPoolExecutor
+    )
+    return pools
+
+
+@pytest.fixture
+def two_camera_env(monkeypatch, copy_pools):
+    # Make sure the thread pool is used, even on a machine with a single core
+    monkeypatch.setattr(HolodeckAgent, "_copy_workers", 2)
+
+    binary_path = holodeck.packagemanager.get_binary_path_for_package("DefaultWorlds")
+
+    with holodeck.environments.HolodeckEnvironment(
+        scenario=two_camera_config,
+        binary_path=binary_path,
+        show_viewport=False,
+        uuid=str(uuid.uuid4()),
+    ) as env:
+        yield env
+
+
+def test_parallel_state_copy(two_camera_env, copy_pools):
+    """Make sure that large sensors copied by the thread pool match the shared memory they were
+    copied from, and are not views of it"""
+    agent = two_camera_env.agents["sphere0"]
+
+    state = two_camera_env.tick()
+
+    assert len(copy_pools) == 1, "The cameras weren't copied in parallel"
+    for camera in ("LeftCamera", "RightCamera"):
+        live = agent.agent_state_dict[camera]
+        assert np.array_equal(state[camera], live)
+        assert not np.shares_memory(state[camera], live)
+
+
+def test_copy_pool_survives_reset(two_camera_env, copy_pools):
+    """Make sure that resetting the environment keeps using the same thread pool"""
+    two_camera_env.tick()
+    two_camera_env.reset()
+    two_camera_env.tick()
+
+    assert len(copy_pools) == 1
+
+
+def test_clean_up_shuts_down_copy_pool(two_camera_env, copy_pools):
+    """Make sure that cleaning up an agent shuts its thread pool down"""
+    two_camera_env.tick()
+
+    two_camera_env.agents["sphere0"].clean_up_resources()
+
+    with pytest.raises(RuntimeError):
+        copy_pools[0].submit(int)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Requires os.fork")
+def test_parallel_state_copy_after_fork(two_camera_env):
+    """Make sure that a forked process doesn't wait forever on the thread pool of its parent"""
+    agent = two_camera_env.agents["sphere0"]
+    two_camera_env.tick()
+
+    pid = os.fork()
+    if pid == 0:
+        # The alarm kills the child if copying hangs
+        signal.alarm(10)
+        try:
+            agent.copy_state_dict()
+        except BaseException:
+            os._exit(1)
+        os._exit(0)
+
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status), "Copying the state hung in the forked process"
+    assert os.WEXITSTATUS(status) == 0, "Copying the state failed in the forked process"
@@ -96,3 +96,75 @@ def test_rotation_with_randomization():
 
             prev_start_rotation = cur_rotation
             env.reset()
+
+
+def test_randomization_with_seed():
+    """
+    Validate that environments with the same seed randomize the agent the same way
+    """
+    bin_path = pm.get_binary_path_for_package("DefaultWorlds")
+    conf = copy.deepcopy(base_conf)
+
+    start_locations = []
+    for _ in range(2):
+        with HolodeckEnvironment(
+            scenario=conf,
+            binary_path=bin_path,
+            show_viewport=False,
+            uuid=str(uuid.uuid4()),
+            seed=42,
+        ) as env:
+            locations = []
+            for _ in range(3):
+                locations.append(np.array(env.tick()["LocationSensor"]))
+                env.reset()
+            start_locations.append(locations)
+
+    for first, second in zip(*start_locations):
+        assert np.allclose(first, second, atol=1e-3)
+
+
+def test_yaw_randomization():
+    """
+    Validate that only the yaw of the agent varies when only the yaw is randomized
+    """
+    bin_path = pm.get_binary_path_for_package("DefaultWorlds")
+    conf = copy.deepcopy(base_conf)
+    conf["agents"][0]["rotation"] = [0, 0, 0]
+    conf["agents"][0]["location_randomization"] = [0, 0, 0]
+    conf["agents"][0]["rotation_randomization"] = [0, 0, 30]
+
+    with HolodeckEnvironment(
+        scenario=conf, binary_path=bin_path, show_viewport=False, uuid=str(uuid.uuid4())
+    ) as env:
+        yaws = []
+        for _ in range(5):
+            roll, pitch, yaw = env.tick()["RotationSensor"]
+
+            assert abs(roll) < 1 and abs(pitch) < 1, "Roll or pitch was randomized"
+            assert abs(yaw) <= 31
+            yaws.append(yaw)
+            env.reset()
+
+        assert not np.allclose(yaws, yaws[0]), "Yaw was not randomized"
+
+
+def test_negative_randomization():
+    """
+    Validate that negative randomization values are accepted, as the same range as positive ones
+    """
+    bin_path = pm.get_binary_path_for_package("DefaultWorlds")
+    conf = copy.deepcopy(base_conf)
+    conf["agents"][0]["location_randomization"] = [-0.6, -0.5, 0]
+    conf["agents"][0]["rotation_randomization"] = [0, 0, -30]
+
+    with HolodeckEnvironment(
+        scenario=conf, binary_path=bin_path, show_viewport=False, uuid=str(uuid.uuid4())
+    ) as env:
+        start_location = conf["agents"][0]["location"]
+        for _ in range(5):
+            location = env.tick()["LocationSensor"]
+
+            assert abs(location[0] - start_location[0]) <= 0.6 + 1e-3
+            assert abs(location[1] - start_location[1]) <= 0.5 + 1e-3
+            env.reset()
@@ -0,0 +1,63 @@
+import uuid
+import holodeck
+from holodeck.sensors import SensorDefinition
+
+from tests.utils.equality import almost_equal
+
+sphere_config = {
+    "name": "test_reset_reuses_agents",
+    "world": "TestWorld",
+    "main_agent": "sphere0",
+    "agents": [
+        {
+            "agent_name": "sphere0",
+            "agent_type": "SphereAgent",
+            "sensors": [
+                {
+                    "sensor_type": "LocationSensor",
+                }
+            ],
+            "control_scheme": 0,
+            "location": [0.95, -1.75, 0.5],
+        }
+    ],
+}
+
+
+def test_reset_reuses_agents_and_sensors():
+    """Make sure that reset() respawns the same agent and sensor objects, and that they still
+    report the state of the new episode
+    """
+    binary_path = holodeck.packagemanager.get_binary_path_for_package("DefaultWorlds")
+
+    with holodeck.environments.HolodeckEnvironment(
+        scenario=sphere_config,
+        binary_path=binary_path,
+        show_viewport=False,
+        uuid=str(uuid.uuid4()),
+    ) as env:
+        env.tick()
+        start_loc = env.tick()["LocationSensor"].copy()
+
+        agent = env.agents["sphere0"]
+        sensor = agent.sensors["LocationSensor"]
+
+        # Move the agent away and give it a sensor that isn't in the scenario
+        agent.teleport([507, 301, 1620], [0, 0, 0])
+        agent.add_sensors(
+            SensorDefinition("sphere0", "SphereAgent", "Velocity", "VelocitySensor")
+        )
+        state = env.tick()
+        assert "Velocity" in state
+        assert not almost_equal(start_loc, state["LocationSensor"])
+
+        env.reset()
+        env.tick()
+        state = env.tick()
+
+        assert env.agents["sphere0"] is agent, "The agent was built again"
+        assert agent.sensors["LocationSensor"] is sensor, "The sensor was built again"
+        assert "Velocity" not in state, "A runtime sensor survived the reset"
+        assert almost_equal(
+            start_loc, state["LocationSensor"]
+        ), "The reused sensor doesn't report the location of the new episode"
@@ -10,8 +10,11 @@ def test_using_make_with_custom_config():
 
     conf = {"name": "test_randomization", "agents": []}
 
-    # pick a random world from the installed packages
-    pkg = random.choice(list(holodeck.packagemanager._iter_packages()))
+    # pick a random world from the installed packages, in one pass over them (reservoir sampling)
+    pkg = None
+    for i, candidate in enumerate(holodeck.packagemanager._iter_packages()):
+        if random.random() < 1 / (i + 1):
+            pkg = candidate
 
     world = random.choice(pkg[0]["worlds"])["name"]
 
@@ -0,0 +1,35 @@
+import os
+import uuid
+import numpy as np
+import pytest
+from holodeck.shmem import Shmem
+
+pytestmark = pytest.mark.skipif(
+    os.name != "posix", reason="Windows mappings are only closed by the engine"
+)
+
+
+def test_asarray_shares_memory():
+    """Make sure that np.asarray wraps the shared memory instead of copying it"""
+    shmem = Shmem("test_asarray", [4], np.float32, str(uuid.uuid4()))
+    try:
+        array = np.asarray(shmem)
+        array[0] = 3
+        assert shmem.np_array[0] == 3
+        assert np.shares_memory(array, shmem.np_array)
+
+        assert np.asarray(shmem, dtype=np.float64).dtype == np.float64
+        assert not np.shares_memory(np.array(shmem, copy=True), shmem.np_array)
+    finally:
+        shmem.unlink()
+
+
+def test_asarray_outlives_unlink():
+    """Make sure that unlinking a block doesn't unmap it from under an array made from it"""
+    shmem = Shmem("test_outlives_unlink", [1024], np.float32, str(uuid.uuid4()))
+    array = np.asarray(shmem)
+    array[:4] = 1
+
+    shmem.unlink()
+
+    assert np.array_equal(array[:4], np.ones(4))